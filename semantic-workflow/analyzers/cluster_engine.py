@@ -3,13 +3,14 @@ Part 1: Cluster & Define Engine
 Handles both DISCOVER and POPULATE modes for keyword clustering and category detection.
 """
 
+import itertools
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import streamlit as st
 
 from core.embeddings import EmbeddingGenerator
-from core.clustering import KeywordClusterer
+from core.clustering import KeywordClusterer, cluster_row_indices
 from core.nlp_analysis import NLPAnalyzer
 from core.utils import validate_keywords_csv
 
@@ -51,16 +52,15 @@ class ClusterEngine:
 
         # Filter by volume
         if min_volume > 0:
-            df_filtered = df[df['volume'] >= min_volume].copy()
+            mask = df['volume'].to_numpy() >= min_volume
+            df_filtered = df.iloc[mask].reset_index(drop=True)
             st.info(f"Filtered to {len(df_filtered)} keywords (volume >= {min_volume})")
         else:
-            df_filtered = df.copy()
+            df_filtered = df.reset_index(drop=True)
 
         # Generate embeddings
         st.subheader("Step 1: Generating Embeddings")
-        keywords_list = df_filtered['keyword'].tolist()
-        embeddings = self.embedding_gen.get_embeddings_batch(keywords_list)
-        df_filtered['embedding'] = embeddings
+        df_filtered, embeddings = self._embed_keywords(df_filtered)
 
         # Cluster keywords
         st.subheader("Step 2: Clustering Keywords")
@@ -68,7 +68,10 @@ class ClusterEngine:
 
         # Analyze clusters
         st.subheader("Step 3: Analyzing Clusters")
-        cluster_analyses = self.clusterer.analyze_all_clusters(df_filtered, embeddings)
+        cluster_indices = cluster_row_indices(df_filtered['cluster'])
+        cluster_analyses = self.clusterer.analyze_all_clusters(
+            df_filtered, embeddings, normalized=True, cluster_indices=cluster_indices
+        )
 
         # Detect natural categories for each cluster
         st.subheader("Step 4: Detecting Natural Categories")
@@ -76,7 +79,9 @@ class ClusterEngine:
 
         # Detect cannibalization
         st.subheader("Step 5: Detecting Cannibalization")
-        cannibalization = self.clusterer.detect_cannibalization(df_filtered, embeddings)
+        cannibalization = self.clusterer.detect_cannibalization(
+            df_filtered, embeddings, normalized=True, cluster_indices=cluster_indices
+        )
 
         if cannibalization:
             st.warning(f"⚠️ Found {len(cannibalization)} potential cannibalization pairs")
@@ -113,16 +118,15 @@ class ClusterEngine:
 
         # Filter by volume
         if min_volume > 0:
-            df_filtered = df[df['volume'] >= min_volume].copy()
+            mask = df['volume'].to_numpy() >= min_volume
+            df_filtered = df.iloc[mask].reset_index(drop=True)
             st.info(f"Filtered to {len(df_filtered)} keywords (volume >= {min_volume})")
         else:
-            df_filtered = df.copy()
+            df_filtered = df.reset_index(drop=True)
 
         # Generate embeddings
         st.subheader("Step 1: Generating Embeddings")
-        keywords_list = df_filtered['keyword'].tolist()
-        embeddings = self.embedding_gen.get_embeddings_batch(keywords_list)
-        df_filtered['embedding'] = embeddings
+        df_filtered, embeddings = self._embed_keywords(df_filtered)
 
         # Cluster keywords
         st.subheader("Step 2: Clustering Keywords")
@@ -130,7 +134,10 @@ class ClusterEngine:
 
         # Analyze clusters
         st.subheader("Step 3: Analyzing Clusters")
-        cluster_analyses = self.clusterer.analyze_all_clusters(df_filtered, embeddings)
+        cluster_indices = cluster_row_indices(df_filtered['cluster'])
+        cluster_analyses = self.clusterer.analyze_all_clusters(
+            df_filtered, embeddings, normalized=True, cluster_indices=cluster_indices
+        )
 
         # Test clusters against target category
         st.subheader(f"Step 4: Testing Against Target '{target_category}'")
@@ -138,6 +145,108 @@ class ClusterEngine:
 
         return strategic_brief
 
+    def _embed_keywords(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Generate embeddings for every keyword as one contiguous, L2-normalized
+        float16 matrix, so downstream cosine similarity is a plain dot product.
+
+        Args:
+            df: DataFrame with 'keyword' column
+
+        Returns:
+            Tuple of (DataFrame, embedding matrix) with rows aligned by position.
+            Keywords whose embedding failed are dropped from both.
+        """
+        keywords_list = df['keyword'].tolist()
+        embeddings = self.embedding_gen.get_embeddings_batch(keywords_list)
+
+        # Failed rows are NaN (all rows fail if no embedding came back at all)
+        ok = ~np.isnan(embeddings).any(axis=1) & (embeddings.shape[1] > 0)
+        if not ok.all():
+            st.warning(f"⚠️ Skipping {int((~ok).sum())} keywords without embeddings")
+            df = df[ok].reset_index(drop=True)
+            embeddings = embeddings[ok]
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.divide(embeddings, np.maximum(norms, 1e-12), out=embeddings)
+
+        # Unit vectors need no more than half precision for cosine ranking
+        return df, embeddings.astype(np.float16)
+
+    def _analyze_cluster_texts(
+        self,
+        cluster_analyses: Dict[int, Dict],
+        cluster_ids: List[int]
+    ) -> Dict[int, Dict]:
+        """
+        Run Google NLP on every cluster's combined keywords in one batch.
+
+        Args:
+            cluster_analyses: Dict of cluster analyses
+            cluster_ids: Clusters to analyze
+
+        Returns:
+            Dict mapping cluster_id to analyze_text_full result
+        """
+        texts = [
+            # Combine all keywords in cluster
+            ' '.join(itertools.chain(
+                cluster_analyses[cluster_id]['primary'],
+                cluster_analyses[cluster_id]['secondary'],
+                cluster_analyses[cluster_id]['tertiary']
+            ))
+            for cluster_id in cluster_ids
+        ]
+
+        results = self.nlp_analyzer.analyze_texts_batch(texts)
+        return dict(zip(cluster_ids, results))
+
+    def _brief_base_columns(
+        self,
+        cluster_analyses: Dict[int, Dict],
+        cluster_ids: List[int]
+    ) -> Dict[str, object]:
+        """
+        Build the strategic brief columns shared by both modes.
+
+        Args:
+            cluster_analyses: Dict of cluster analyses
+            cluster_ids: Clusters in brief row order
+
+        Returns:
+            Dict of column name to column values, in brief column order
+        """
+        K = len(cluster_ids)
+        hub_keywords = [None] * K
+        total_keywords = np.empty(K, dtype=np.int64)
+        total_volume = np.empty(K, dtype=np.float64)
+        coherence = np.empty(K, dtype=np.float64)
+        primary_keywords = [None] * K
+        secondary_keywords = [None] * K
+        tertiary_keywords = [None] * K
+
+        for idx, cluster_id in enumerate(cluster_ids):
+            analysis = cluster_analyses[cluster_id]
+            hub_keywords[idx] = analysis['hub_keyword']
+            total_keywords[idx] = analysis['total_keywords']
+            total_volume[idx] = analysis['total_volume']
+            coherence[idx] = analysis['coherence']
+            primary_keywords[idx] = ', '.join(analysis['primary'])
+            secondary_keywords[idx] = ', '.join(analysis['secondary'][:5])  # Top 5 for display
+            tertiary_keywords[idx] = f"{len(analysis['tertiary'])} additional"
+
+        return {
+            'cluster_id': np.asarray(cluster_ids, dtype=np.int64),
+            'cluster_name': hub_keywords,
+            'hub_keyword': hub_keywords,
+            'total_keywords': total_keywords,
+            'total_volume': total_volume,
+            'coherence': coherence,
+            'primary_keywords': primary_keywords,
+            'secondary_keywords': secondary_keywords,
+            'tertiary_keywords': tertiary_keywords
+        }
+
     def _detect_cluster_categories(
         self,
         df: pd.DataFrame,
@@ -153,58 +262,30 @@ class ClusterEngine:
         Returns:
             DataFrame with strategic brief
         """
-        brief_data = []
-
         cluster_ids = sorted(cluster_analyses.keys())
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        for idx, cluster_id in enumerate(cluster_ids):
-            progress = (idx + 1) / len(cluster_ids)
-            progress_bar.progress(progress)
-
-            analysis = cluster_analyses[cluster_id]
-            hub_keyword = analysis['hub_keyword']
+        nlp_results = self._analyze_cluster_texts(cluster_analyses, cluster_ids)
 
-            status_text.text(f"Testing cluster {idx + 1}/{len(cluster_ids)}: '{hub_keyword}'")
+        K = len(cluster_ids)
+        detected_category = [None] * K
+        category_confidence = np.zeros(K, dtype=np.float64)
+        top_entities = [''] * K
 
-            # Combine all keywords in cluster
-            cluster_keywords = analysis['primary'] + analysis['secondary'] + analysis['tertiary']
-            combined_text = ' '.join(cluster_keywords)
-
-            # Analyze with Google NLP
-            result = self.nlp_analyzer.analyze_text(combined_text)
-
-            detected_category = None
-            category_confidence = 0.0
-            top_entities = []
+        for idx, cluster_id in enumerate(cluster_ids):
+            result = nlp_results[cluster_id]
 
             if result['categories']:
-                detected_category = result['categories'][0]['name']
-                category_confidence = result['categories'][0]['confidence']
+                detected_category[idx] = result['categories'][0]['name']
+                category_confidence[idx] = result['categories'][0]['confidence']
 
             if result['entities']:
-                top_entities = [e['name'] for e in result['entities'][:5]]
-
-            brief_data.append({
-                'cluster_id': cluster_id,
-                'cluster_name': hub_keyword,
-                'hub_keyword': hub_keyword,
-                'total_keywords': analysis['total_keywords'],
-                'total_volume': analysis['total_volume'],
-                'coherence': analysis['coherence'],
-                'primary_keywords': ', '.join(analysis['primary']),
-                'secondary_keywords': ', '.join(analysis['secondary'][:5]),  # Top 5 for display
-                'tertiary_keywords': f"{len(analysis['tertiary'])} additional",
-                'detected_category': detected_category,
-                'category_confidence': category_confidence,
-                'top_entities': ', '.join(top_entities)
-            })
-
-        progress_bar.progress(1.0)
-        status_text.text(f"✅ Analyzed {len(cluster_ids)} clusters")
-
-        return pd.DataFrame(brief_data)
+                top_entities[idx] = ', '.join(e['name'] for e in result['entities'][:5])
+
+        brief = self._brief_base_columns(cluster_analyses, cluster_ids)
+        brief['detected_category'] = detected_category
+        brief['category_confidence'] = category_confidence
+        brief['top_entities'] = top_entities
+
+        return pd.DataFrame(brief)
 
     def _test_cluster_targets(
         self,
@@ -223,54 +304,33 @@ class ClusterEngine:
         Returns:
             DataFrame with strategic brief including target matching
         """
-        brief_data = []
-
         cluster_ids = sorted(cluster_analyses.keys())
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        nlp_results = self._analyze_cluster_texts(cluster_analyses, cluster_ids)
+
+        K = len(cluster_ids)
+        matches_target = np.zeros(K, dtype=bool)
+        detected_category = [None] * K
+        confidence_for_target = np.zeros(K, dtype=np.float64)
+        top_entities = [''] * K
 
         for idx, cluster_id in enumerate(cluster_ids):
-            progress = (idx + 1) / len(cluster_ids)
-            progress_bar.progress(progress)
+            full_result = nlp_results[cluster_id]
 
-            analysis = cluster_analyses[cluster_id]
-            hub_keyword = analysis['hub_keyword']
+            # Test against target category
+            result = self.nlp_analyzer.match_target_category(full_result, target_category)
 
-            status_text.text(f"Testing cluster {idx + 1}/{len(cluster_ids)}: '{hub_keyword}'")
+            matches_target[idx] = result['matches_target']
+            detected_category[idx] = result['detected_category']
+            confidence_for_target[idx] = result['confidence']
 
-            # Combine all keywords in cluster
-            cluster_keywords = analysis['primary'] + analysis['secondary'] + analysis['tertiary']
-            combined_text = ' '.join(cluster_keywords)
+            if full_result['entities']:
+                top_entities[idx] = ', '.join(e['name'] for e in full_result['entities'][:5])
 
-            # Test against target category
-            result = self.nlp_analyzer.test_category_match(combined_text, target_category)
-
-            matches_target = result['matches_target']
-            detected_category = result['detected_category']
-            confidence = result['confidence']
-
-            # Also get entities
-            entity_result = self.nlp_analyzer.analyze_text(combined_text, extract_entities=True, classify_content=False)
-            top_entities = [e['name'] for e in entity_result['entities'][:5]] if entity_result['entities'] else []
-
-            brief_data.append({
-                'cluster_id': cluster_id,
-                'cluster_name': hub_keyword,
-                'hub_keyword': hub_keyword,
-                'total_keywords': analysis['total_keywords'],
-                'total_volume': analysis['total_volume'],
-                'coherence': analysis['coherence'],
-                'primary_keywords': ', '.join(analysis['primary']),
-                'secondary_keywords': ', '.join(analysis['secondary'][:5]),
-                'tertiary_keywords': f"{len(analysis['tertiary'])} additional",
-                'target_category': target_category,
-                'matches_target': matches_target,
-                'detected_category': detected_category,
-                'confidence_for_target': confidence,
-                'top_entities': ', '.join(top_entities)
-            })
-
-        progress_bar.progress(1.0)
-        status_text.text(f"✅ Tested {len(cluster_ids)} clusters")
-
-        return pd.DataFrame(brief_data)
+        brief = self._brief_base_columns(cluster_analyses, cluster_ids)
+        brief['target_category'] = target_category
+        brief['matches_target'] = matches_target
+        brief['detected_category'] = detected_category
+        brief['confidence_for_target'] = confidence_for_target
+        brief['top_entities'] = top_entities
+
+        return pd.DataFrame(brief)
@@ -3,13 +3,109 @@ Part 2: Draft Validator
 QA tool for validating content drafts against target categories with iterative optimization.
 """
 
+import re
 import pandas as pd
-from typing import Dict, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
 import streamlit as st
 
-from core.nlp_analysis import NLPAnalyzer
+from core.nlp_analysis import NLPAnalyzer, text_cache_key
 from core.utils import calculate_keyword_coverage
 
+_WORD_RE = re.compile(r'\S+')
+_TOKEN_RE = re.compile(r'\w+')
+
+# Drag analysis is skipped when the baseline already matches above this confidence...
+DRAG_SKIP_ABOVE_CONFIDENCE = 0.90
+# ...or when it is too weak for any single removal to flip the category
+DRAG_SKIP_BELOW_CONFIDENCE = 0.05
+
+# Coverage status thresholds per tier: (tier, good, warn)
+COVERAGE_THRESHOLDS = (
+    ('primary', 0.80, 0.60),
+    ('secondary', 0.60, 0.40),
+)
+
+
+def brief_cluster_positions(brief_df: pd.DataFrame) -> Dict[int, int]:
+    """
+    Map each cluster_id in a strategic brief to its row position.
+
+    The app builds this once per upload and keeps it in
+    ``brief_df.attrs['cluster_positions']``, so lookups are dict hits while
+    the brief keeps its plain RangeIndex.
+
+    Args:
+        brief_df: Strategic brief DataFrame
+
+    Returns:
+        Dict mapping cluster_id to row position (first row wins on duplicates)
+    """
+    positions = {}
+    for pos, cluster_id in enumerate(brief_df['cluster_id'].tolist()):
+        positions.setdefault(cluster_id, pos)
+    return positions
+
+
+def _lookup_cluster(brief_df: pd.DataFrame, cluster_id: int) -> Optional[Dict]:
+    """
+    Fetch a cluster's strategic brief row by cluster_id.
+
+    Uses the positions stored by the app at upload time, and builds them on
+    the fly for briefs passed in without them.
+
+    Args:
+        brief_df: Strategic brief DataFrame
+        cluster_id: Cluster ID to look up
+
+    Returns:
+        The row as a dict (first row wins on duplicates), or None if not found
+    """
+    positions = brief_df.attrs.get('cluster_positions')
+    if positions is None:
+        positions = brief_cluster_positions(brief_df)
+
+    pos = positions.get(cluster_id)
+    if pos is None:
+        return None
+    return brief_df.iloc[pos].to_dict()
+
+
+def parse_keyword_list(value) -> List[str]:
+    """
+    Parse a comma-separated keyword cell from a strategic brief.
+
+    Args:
+        value: Cell value (NaN/None yields an empty list)
+
+    Returns:
+        List of stripped, non-empty keywords
+    """
+    if value is None or pd.isna(value):
+        return []
+    return [k for k in (k.strip() for k in str(value).split(',')) if k]
+
+
+def _split_keywords(cluster_row: Dict) -> Tuple[List[str], List[str]]:
+    """
+    Get the primary and secondary keyword lists of a brief row.
+
+    Uses the pre-split *_keywords_list columns when the brief was loaded
+    through the app, and parses the comma-separated columns otherwise.
+
+    Args:
+        cluster_row: Strategic brief row
+
+    Returns:
+        Tuple of (primary, secondary) keyword lists
+    """
+    primary = cluster_row.get('primary_keywords_list')
+    if primary is None:
+        primary = parse_keyword_list(cluster_row.get('primary_keywords'))
+    secondary = cluster_row.get('secondary_keywords_list')
+    if secondary is None:
+        secondary = parse_keyword_list(cluster_row.get('secondary_keywords'))
+    return list(primary), list(secondary)
+
 
 class DraftValidator:
     """
@@ -43,30 +139,45 @@ class DraftValidator:
         """
         st.header("📋 Draft Validation Report")
 
+        # Look up the brief row once instead of re-scanning the brief per step
+        cluster_row = None
+        if strategic_brief_df is not None and cluster_id is not None:
+            cluster_row = _lookup_cluster(strategic_brief_df, int(cluster_id))
+
+        # Parse the brief's keyword lists once; used by coverage and drag analysis
+        primary, secondary = _split_keywords(cluster_row) if cluster_row is not None else ([], [])
+
+        # Hash once; keys every NLP cache lookup for the draft below
+        draft_key = text_cache_key(draft_text)
+
+        # Lowercase and tokenize once; reused by keyword coverage
+        draft_lower = draft_text.lower()
+        draft_tokens = frozenset(_TOKEN_RE.findall(draft_lower))
+
         results = {
             'target_category': target_category,
             'draft_length': len(draft_text),
-            'word_count': len(draft_text.split())
+            'word_count': sum(1 for _ in _WORD_RE.finditer(draft_text))
         }
 
         # Step 1: Basic category detection
         st.subheader("Step 1: Category Detection - Testing YOUR DRAFT CONTENT")
 
         # Show what we're testing vs what the brief predicted (if available)
-        if strategic_brief_df is not None and cluster_id is not None:
-            cluster_row = strategic_brief_df[strategic_brief_df['cluster_id'] == cluster_id]
-            if not cluster_row.empty:
-                cluster_row = cluster_row.iloc[0]
-                brief_category = cluster_row.get('detected_category', 'N/A')
-                brief_confidence = cluster_row.get('category_confidence', 0)
-
-                st.info(
-                    f"📊 **Strategic Brief Prediction** (based on keywords): "
-                    f"`{brief_category}` ({brief_confidence:.2%} confidence)\n\n"
-                    f"Now testing your actual draft content..."
-                )
+        if cluster_row is not None:
+            brief_category = cluster_row.get('detected_category', 'N/A')
+            brief_confidence = cluster_row.get('category_confidence', 0)
+
+            st.info(
+                f"📊 **Strategic Brief Prediction** (based on keywords): "
+                f"`{brief_category}` ({brief_confidence:.2%} confidence)\n\n"
+                f"Now testing your actual draft content..."
+            )
 
-        match_result = self.nlp_analyzer.test_category_match(draft_text, target_category)
+        # One API call classifies the draft and extracts its entities (Step 2);
+        # drag analysis reuses the same memoized response for its baseline
+        draft_analysis = self.nlp_analyzer.analyze_text_full(draft_text, text_key=draft_key)
+        match_result = self.nlp_analyzer.match_target_category(draft_analysis, target_category)
 
         results['matches_target'] = match_result['matches_target']
         results['detected_category'] = match_result['detected_category']
@@ -85,19 +196,15 @@ class DraftValidator:
             st.write(f"**Confidence:** {match_result['confidence']:.2%}")
 
             # Show comparison if we have brief data
-            if strategic_brief_df is not None and cluster_id is not None:
-                cluster_row = strategic_brief_df[strategic_brief_df['cluster_id'] == cluster_id]
-                if not cluster_row.empty:
-                    cluster_row = cluster_row.iloc[0]
-                    brief_confidence = cluster_row.get('category_confidence', 0)
-                    detected_matches_brief = cluster_row.get('detected_category', '') == match_result['detected_category']
-
-                    if not detected_matches_brief:
-                        st.warning(
-                            f"⚠️ **Performance Gap**: Your keywords predicted `{cluster_row.get('detected_category', 'N/A')}` "
-                            f"but your draft detected `{match_result['detected_category']}`. "
-                            f"Your actual content may be sending different topical signals than your keyword strategy."
-                        )
+            if cluster_row is not None:
+                detected_matches_brief = cluster_row.get('detected_category', '') == match_result['detected_category']
+
+                if not detected_matches_brief:
+                    st.warning(
+                        f"⚠️ **Performance Gap**: Your keywords predicted `{cluster_row.get('detected_category', 'N/A')}` "
+                        f"but your draft detected `{match_result['detected_category']}`. "
+                        f"Your actual content may be sending different topical signals than your keyword strategy."
+                    )
 
         # Show all categories
         with st.expander("View All Detected Categories"):
@@ -108,29 +215,31 @@ class DraftValidator:
         st.subheader("Step 2: Entity Analysis - From YOUR DRAFT")
 
         # Show comparison if we have strategic brief
-        if strategic_brief_df is not None and cluster_id is not None:
-            cluster_row = strategic_brief_df[strategic_brief_df['cluster_id'] == cluster_id]
-            if not cluster_row.empty:
-                cluster_row = cluster_row.iloc[0]
-                brief_entities = cluster_row.get('top_entities', 'N/A')
-                st.info(
-                    f"📊 **Strategic Brief Entities** (from keywords): {brief_entities}\n\n"
-                    f"Entities detected in your actual draft content:"
-                )
-
-        entity_result = self.nlp_analyzer.analyze_text(
-            draft_text,
-            extract_entities=True,
-            classify_content=False
-        )
+        if cluster_row is not None:
+            brief_entities = cluster_row.get('top_entities', 'N/A')
+            st.info(
+                f"📊 **Strategic Brief Entities** (from keywords): {brief_entities}\n\n"
+                f"Entities detected in your actual draft content:"
+            )
 
-        results['entities'] = entity_result['entities']
+        results['entities'] = draft_analysis['entities']
 
-        if entity_result['entities']:
+        if draft_analysis['entities']:
             st.write("**Top Entities from Draft (by salience):**")
-            for entity in entity_result['entities'][:10]:
-                wiki_link = f" ([Wikipedia]({entity['wikipedia_url']}))" if entity['wikipedia_url'] else ""
-                st.write(f"- **{entity['name']}** (salience: {entity['salience']:.3f}, type: {entity['type']}){wiki_link}")
+            entities_df = pd.DataFrame(
+                draft_analysis['entities'][:10],
+                columns=['name', 'salience', 'type', 'wikipedia_url']
+            )
+            entities_df['wikipedia_url'] = entities_df['wikipedia_url'].replace('', None)
+            st.dataframe(
+                entities_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'salience': st.column_config.NumberColumn(format="%.3f"),
+                    'wikipedia_url': st.column_config.LinkColumn("Wikipedia"),
+                }
+            )
         else:
             st.info("No entities detected")
 
@@ -139,98 +248,115 @@ class DraftValidator:
             st.subheader("Step 3: Keyword Coverage Analysis")
             coverage = self._analyze_keyword_coverage(
                 draft_text,
-                strategic_brief_df,
-                cluster_id
+                cluster_row,
+                cluster_id,
+                primary,
+                secondary,
+                draft_lower=draft_lower,
+                draft_tokens=draft_tokens
             )
             results['keyword_coverage'] = coverage
 
         # Step 4: Iterative Drag Analysis (if requested)
         if run_drag_analysis:
             st.subheader("Step 4: Iterative Drag Analysis (Optimization)")
-            st.warning("⚠️ This is an expensive operation - it will make many API calls!")
-
-            # Extract official keywords if brief is provided
-            official_keywords = []
-            if strategic_brief_df is not None and cluster_id is not None:
-                cluster_row = strategic_brief_df[strategic_brief_df['cluster_id'] == cluster_id]
-                if not cluster_row.empty:
-                    cluster_row = cluster_row.iloc[0]
-                    primary = [k.strip() for k in str(cluster_row.get('primary_keywords', '')).split(',') if k.strip()]
-                    secondary = [k.strip() for k in str(cluster_row.get('secondary_keywords', '')).split(',') if k.strip()]
-                    official_keywords = primary + secondary
-
-            with st.spinner("Running iterative drag analysis..."):
-                drag_results = self.nlp_analyzer.iterative_drag_analysis(
-                    text=draft_text,
-                    target_category=target_category,
-                    entities_to_test=[e['name'] for e in entity_result['entities']],
-                    official_keywords=official_keywords if official_keywords else None,
-                    show_progress=True
-                )
 
-            results['drag_analysis'] = drag_results
-            self._display_drag_analysis(drag_results)
+            baseline_confidence = match_result['confidence']
+            if match_result['matches_target'] and baseline_confidence > DRAG_SKIP_ABOVE_CONFIDENCE:
+                st.info(
+                    f"💡 Skipping drag analysis - your draft already matches the target at "
+                    f"{baseline_confidence:.2%} confidence, so there is little left to gain."
+                )
+            elif baseline_confidence < DRAG_SKIP_BELOW_CONFIDENCE:
+                st.info(
+                    f"💡 Skipping drag analysis - baseline confidence is only {baseline_confidence:.2%}, "
+                    f"too weak for removing single entities to change the category. "
+                    f"Consider rewriting the draft around the target topic first."
+                )
+            else:
+                st.warning("⚠️ This is an expensive operation - it will make many API calls!")
+
+                # Extract official keywords if brief is provided
+                official_keywords = primary + secondary
+
+                # Removal matching ignores case, so case variants are one candidate
+                entity_names = {}
+                for entity in draft_analysis['entities']:
+                    entity_names.setdefault(entity['name'].lower(), entity['name'])
+
+                with st.spinner("Running iterative drag analysis..."):
+                    drag_results = self.nlp_analyzer.iterative_drag_analysis(
+                        text=draft_text,
+                        target_category=target_category,
+                        entities_to_test=list(entity_names.values()),
+                        official_keywords=official_keywords if official_keywords else None,
+                        text_key=draft_key,
+                        show_progress=True
+                    )
+
+                results['drag_analysis'] = drag_results
+                self._display_drag_analysis(drag_results)
 
         return results
 
     def _analyze_keyword_coverage(
         self,
         draft_text: str,
-        strategic_brief_df: pd.DataFrame,
-        cluster_id: int
+        cluster_row: Optional[Dict],
+        cluster_id: int,
+        primary: List[str],
+        secondary: List[str],
+        draft_lower: Optional[str] = None,
+        draft_tokens: Optional[FrozenSet[str]] = None
     ) -> Dict:
         """
         Analyze keyword coverage from strategic brief.
 
         Args:
             draft_text: Draft content
-            strategic_brief_df: Strategic brief DataFrame
+            cluster_row: Strategic brief row for the cluster (None if not found)
             cluster_id: Cluster ID to analyze
+            primary: Primary keywords parsed from cluster_row
+            secondary: Secondary keywords parsed from cluster_row
+            draft_lower: Pre-lowercased draft_text, if already computed
+            draft_tokens: Word tokens of draft_lower, if already computed
 
         Returns:
             Dict with coverage analysis
         """
-        # Find cluster in brief
-        cluster_row = strategic_brief_df[strategic_brief_df['cluster_id'] == cluster_id]
-
-        if cluster_row.empty:
+        if cluster_row is None:
             st.error(f"Cluster ID {cluster_id} not found in strategic brief")
             return {}
 
-        cluster_row = cluster_row.iloc[0]
-
-        # Extract keywords
-        primary = [k.strip() for k in str(cluster_row.get('primary_keywords', '')).split(',') if k.strip()]
-        secondary = [k.strip() for k in str(cluster_row.get('secondary_keywords', '')).split(',') if k.strip()]
         tertiary = []  # Not storing full list in CSV
 
         coverage = calculate_keyword_coverage(
             draft_text,
             primary,
             secondary,
-            tertiary
+            tertiary,
+            draft_lower=draft_lower,
+            draft_tokens=draft_tokens
         )
 
         # Display coverage
         st.write("**Keyword Coverage:**")
 
-        primary_pct = coverage['primary']['percentage']
-        primary_status = "✅" if primary_pct >= 0.80 else "⚠️" if primary_pct >= 0.60 else "❌"
-        st.write(f"{primary_status} **Primary:** {primary_pct:.0%} ({coverage['primary']['found']}/{coverage['primary']['total']})")
-
-        if coverage['primary']['missing']:
-            with st.expander("Missing Primary Keywords"):
-                for kw in coverage['primary']['missing']:
-                    st.write(f"- {kw}")
-
-        secondary_pct = coverage['secondary']['percentage']
-        secondary_status = "✅" if secondary_pct >= 0.60 else "⚠️" if secondary_pct >= 0.40 else "❌"
-        st.write(f"{secondary_status} **Secondary:** {secondary_pct:.0%} ({coverage['secondary']['found']}/{coverage['secondary']['total']})")
+        for tier, good, warn in COVERAGE_THRESHOLDS:
+            pct = coverage[tier]['percentage']
+            status = "✅" if pct >= good else "⚠️" if pct >= warn else "❌"
+            st.write(
+                f"{status} **{tier.title()}:** {pct:.0%} "
+                f"({coverage[tier]['found']}/{coverage[tier]['total']})"
+            )
 
-        if coverage['secondary']['missing']:
-            with st.expander("Missing Secondary Keywords"):
-                for kw in coverage['secondary']['missing'][:10]:
-                    st.write(f"- {kw}")
+        missing_df = pd.DataFrame(
+            [(tier.title(), kw) for tier, _, _ in COVERAGE_THRESHOLDS for kw in coverage[tier]['missing']],
+            columns=['tier', 'keyword']
+        )
+        if not missing_df.empty:
+            with st.expander(f"Missing Keywords ({len(missing_df)})"):
+                st.dataframe(missing_df, use_container_width=True, hide_index=True)
 
         return coverage
 
@@ -274,16 +400,15 @@ class DraftValidator:
         if iterations:
             st.write(f"\n**Optimization Steps ({len(iterations)} iterations):**")
 
-            for it in iterations:
-                improvement_pct = it['improvement']
-                is_official = it.get('is_official_keyword', False)
-                icon = "🚨" if is_official else "🧹"
-
-                st.write(
-                    f"{it['iteration']}. {icon} Remove **'{it['removed']}'** → "
-                    f"{it['old_confidence']:.2%} → {it['new_confidence']:.2%} "
-                    f"(+{improvement_pct:.2%})"
-                )
+            iter_df = pd.DataFrame({
+                'step': [it['iteration'] for it in iterations],
+                'type': ["🚨 Official" if it.get('is_official_keyword', False) else "🧹 Other" for it in iterations],
+                'removed': [it['removed'] for it in iterations],
+                'old_confidence': [f"{it['old_confidence']:.2%}" for it in iterations],
+                'new_confidence': [f"{it['new_confidence']:.2%}" for it in iterations],
+                'improvement': [f"+{it['improvement']:.2%}" for it in iterations],
+            })
+            st.dataframe(iter_df, use_container_width=True, hide_index=True)
 
             # Separate recommendations by list
             st.write("\n**📋 RECOMMENDATIONS:**")
@@ -295,8 +420,7 @@ class DraftValidator:
                     f"Removing these entities (from your draft copy) will boost confidence. "
                     f"These are NOT your official keywords - just messy entities in the content."
                 )
-                for term in removed_other:
-                    st.write(f"- ❌ {term}")
+                st.markdown("\n".join(f"- ❌ {term}" for term in removed_other))
 
             # List A (Official Keywords) - Strategic problem!
             if removed_official:
@@ -305,8 +429,10 @@ class DraftValidator:
                     f"⚠️ Your **official keywords** are actively harming your topical signal! "
                     f"These are from your strategic brief - removing them means your brief may be wrong."
                 )
-                for term in removed_official:
-                    st.write(f"- 🚨 **{term}** (Official Keyword - consider removing from brief)")
+                st.markdown("\n".join(
+                    f"- 🚨 **{term}** (Official Keyword - consider removing from brief)"
+                    for term in removed_official
+                ))
 
                 st.warning(
                     "**Action Required:** Review your strategic brief. These official keywords "
@@ -325,6 +451,8 @@ class DraftValidator:
 
             # Show entity breakdown if we have list counts
             if list_a_count > 0 or list_b_count > 0:
-                st.write(f"\n**Entity Analysis:**")
-                st.write(f"- List A (Official Keywords): {list_a_count} total, {len(removed_official)} removed")
-                st.write(f"- List B (Other Entities): {list_b_count} total, {len(removed_other)} removed")
+                st.markdown(
+                    f"**Entity Analysis:**\n"
+                    f"- List A (Official Keywords): {list_a_count} total, {len(removed_official)} removed\n"
+                    f"- List B (Other Entities): {list_b_count} total, {len(removed_other)} removed"
+                )
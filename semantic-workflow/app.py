@@ -7,6 +7,9 @@ Two-mode workflow:
 2. Validate Draft: QA tool for content validation with iterative optimization
 """
 
+import atexit
+import hashlib
+import io
 import os
 import streamlit as st
 import pandas as pd
@@ -14,9 +17,28 @@ import json
 import tempfile
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+try:
+    from streamlit_searchbox import st_searchbox
+    _HAS_SEARCHBOX = True
+except ImportError:
+    _HAS_SEARCHBOX = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
 from analyzers.cluster_engine import ClusterEngine
-from analyzers.draft_validator import DraftValidator
-from core.categories import ALL_CATEGORIES
+from analyzers.draft_validator import DraftValidator, brief_cluster_positions, parse_keyword_list
+from core.categories import ALL_CATEGORIES, search_categories
 
 # Load environment variables (for local development)
 load_dotenv()
@@ -25,6 +47,27 @@ load_dotenv()
 # CREDENTIAL HANDLING - Supports both Streamlit Cloud and local development
 # ============================================================================
 
+def _remove_file(path: str):
+    """Delete a file if it still exists."""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+@st.cache_resource(show_spinner=False)
+def _materialize_google_creds(creds_json_str: str) -> str:
+    """
+    Write Google credentials JSON to a temp file once per distinct secret.
+    The file is removed when the process exits.
+    Returns: Path to the credentials file
+    """
+    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
+    json.dump(json.loads(creds_json_str), temp_file)
+    temp_file.close()
+
+    atexit.register(_remove_file, temp_file.name)
+    return temp_file.name
+
+
 def get_credentials():
     """
     Get API credentials from Streamlit secrets (cloud) or environment variables (local).
@@ -42,13 +85,9 @@ def get_credentials():
         if "GOOGLE_APPLICATION_CREDENTIALS_JSON" in st.secrets:
             google_creds_json = st.secrets["GOOGLE_APPLICATION_CREDENTIALS_JSON"]
 
-            # Write JSON to a temporary file
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-            json.dump(json.loads(google_creds_json), temp_file)
-            temp_file.close()
-
-            google_creds_path_default = temp_file.name
-            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = temp_file.name
+            # Write JSON to a temporary file (once; reruns reuse the same path)
+            google_creds_path_default = _materialize_google_creds(google_creds_json)
+            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = google_creds_path_default
     except Exception:
         # Secrets not available (local development) - use environment variables
         pass
@@ -65,6 +104,136 @@ def get_credentials():
 # Get default credentials
 openai_key_default, google_creds_path_default = get_credentials()
 
+# ============================================================================
+# DATA LOADING - Cached so widget reruns don't re-parse uploads
+# ============================================================================
+
+@st.cache_data(show_spinner=False)
+def _load_csv(file_bytes: bytes) -> pd.DataFrame:
+    """
+    Parse an uploaded CSV, cached on its raw bytes.
+    Uses pyarrow's multithreaded reader when installed, falling back to
+    pandas' C engine for files it can't parse.
+    Returns: DataFrame
+    """
+    if _HAS_PYARROW:
+        try:
+            table = pacsv.read_csv(
+                pa.BufferReader(file_bytes),
+                read_options=pacsv.ReadOptions(block_size=1 << 20)
+            )
+            return table.to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return pd.read_csv(io.BytesIO(file_bytes), engine='c', low_memory=False)
+
+
+@st.cache_data(show_spinner=False)
+def _detect_columns(columns: tuple) -> tuple:
+    """
+    Guess which uploaded columns hold keywords and volumes, for the preview.
+    Cached on the column names, so it runs once per distinct header.
+    Returns: (keyword_candidates, volume_candidates)
+    """
+    names = pd.Series(columns, dtype=object).astype(str).str.lower().str.replace(r'[_-]', ' ', regex=True)
+    keyword_candidates = [c for c, hit in zip(columns, names.str.contains('keyword|query|term|phrase')) if hit]
+    volume_candidates = [c for c, hit in zip(columns, names.str.contains('volume|search|msv|sv')) if hit]
+    return keyword_candidates, volume_candidates
+
+
+@st.cache_data(show_spinner=False)
+def _load_brief(file_bytes: bytes) -> pd.DataFrame:
+    """
+    Parse an uploaded strategic brief. Keyword columns are also
+    pre-split into *_keywords_list columns, and the cluster_id -> row
+    position map used by validation is built, once per upload.
+    Returns: DataFrame
+    """
+    brief_df = _load_csv(file_bytes)
+    brief_df.attrs['cluster_positions'] = brief_cluster_positions(brief_df)
+    for col in ('primary_keywords', 'secondary_keywords'):
+        if col in brief_df.columns:
+            brief_df[f'{col}_list'] = [parse_keyword_list(v) for v in brief_df[col]]
+    return brief_df
+
+
+@st.cache_data(show_spinner=False)
+def _to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a strategic brief to CSV, cached so reruns don't re-encode it.
+    Returns: UTF-8 encoded CSV bytes
+    """
+    return df.to_csv(index=False).encode('utf-8')
+
+
+@st.cache_data(show_spinner=False)
+def _to_json_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a strategic brief to a JSON records array, cached like _to_csv_bytes.
+    Uses orjson when installed, which writes bytes directly and is several
+    times faster than pandas' JSON writer.
+    Returns: UTF-8 encoded JSON bytes
+    """
+    if _HAS_ORJSON:
+        return orjson.dumps(
+            df.to_dict(orient='records'),
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return df.to_json(orient='records', indent=2).encode('utf-8')
+
+# ============================================================================
+# CACHED RESOURCES - API clients reused across reruns instead of per click
+# ============================================================================
+
+@st.cache_resource(show_spinner=False)
+def get_engine(openai_api_key: str, distance_threshold: float) -> ClusterEngine:
+    """
+    Get a ClusterEngine for the given key and threshold, built once per combination.
+    Returns: ClusterEngine
+    """
+    return ClusterEngine(
+        openai_api_key=openai_api_key,
+        distance_threshold=distance_threshold
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_validator(google_creds_path: str) -> DraftValidator:
+    """
+    Get a DraftValidator, built once per credentials path so the Google
+    client's gRPC channel is reused across validations.
+    Returns: DraftValidator
+    """
+    return DraftValidator()
+
+
+# ============================================================================
+# WIDGETS
+# ============================================================================
+
+def category_picker(key: str) -> str:
+    """
+    Searchable target-category input.
+    Filters server-side with search_categories when streamlit-searchbox is
+    installed; otherwise a selectbox over every category.
+    Returns: Selected category path ("" if none)
+    """
+    if _HAS_SEARCHBOX:
+        return st_searchbox(
+            search_categories,
+            placeholder="Search categories (e.g., 'travel', 'family')",
+            key=key
+        ) or ""
+
+    return st.selectbox(
+        "Select or search for your target category",
+        options=[""] + ALL_CATEGORIES,
+        help="Start typing to search Google's predefined categories",
+        label_visibility="collapsed",
+        key=key
+    )
+
+
 # Page config
 st.set_page_config(
     page_title="Semantic Content Workflow",
@@ -161,12 +330,7 @@ with tab1:
     target_category = None
     if "POPULATE" in mode:
         st.write("**Target Category** (searchable dropdown):")
-        target_category = st.selectbox(
-            "Select or search for your target category",
-            options=[""] + ALL_CATEGORIES,
-            help="Start typing to search Google's predefined categories",
-            label_visibility="collapsed"
-        )
+        target_category = category_picker(key="cluster_target")
         if not target_category:
             st.info("💡 Start typing in the dropdown to search categories (e.g., 'travel', 'family', etc.)")
 
@@ -183,7 +347,7 @@ with tab1:
         else:
             try:
                 # Load data
-                df_raw = pd.read_csv(uploaded_file)
+                df_raw = _load_csv(uploaded_file.getvalue())
                 st.success(f"✅ Loaded {len(df_raw)} rows from CSV")
 
                 # Show column detection preview
@@ -191,15 +355,7 @@ with tab1:
                     st.write("**Original columns:**", ", ".join(df_raw.columns.tolist()))
 
                     # Try to detect which columns will be used
-                    cols_lower = df_raw.columns.str.lower().str.strip()
-                    keyword_candidates = [c for c in df_raw.columns if any(
-                        kw in c.lower().replace('_', ' ').replace('-', ' ')
-                        for kw in ['keyword', 'query', 'term', 'phrase']
-                    )]
-                    volume_candidates = [c for c in df_raw.columns if any(
-                        v in c.lower().replace('_', ' ').replace('-', ' ')
-                        for v in ['volume', 'search', 'msv', 'sv']
-                    )]
+                    keyword_candidates, volume_candidates = _detect_columns(tuple(df_raw.columns))
 
                     if keyword_candidates:
                         st.write(f"**Keyword column detected:** `{keyword_candidates[0]}`")
@@ -210,10 +366,7 @@ with tab1:
                     st.dataframe(df_raw.head(3), use_container_width=True)
 
                 # Initialize engine
-                engine = ClusterEngine(
-                    openai_api_key=openai_key,
-                    distance_threshold=cluster_threshold
-                )
+                engine = get_engine(openai_key, cluster_threshold)
 
                 # Run appropriate mode
                 if "DISCOVER" in mode:
@@ -239,19 +392,17 @@ with tab1:
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    csv = strategic_brief.to_csv(index=False)
                     st.download_button(
                         label="📥 Download CSV",
-                        data=csv,
+                        data=_to_csv_bytes(strategic_brief),
                         file_name="strategic_brief.csv",
                         mime="text/csv"
                     )
 
                 with col2:
-                    json = strategic_brief.to_json(orient='records', indent=2)
                     st.download_button(
                         label="📥 Download JSON",
-                        data=json,
+                        data=_to_json_bytes(strategic_brief),
                         file_name="strategic_brief.json",
                         mime="application/json"
                     )
@@ -259,25 +410,25 @@ with tab1:
                 # Show opinionated recommendations
                 st.subheader("💡 Recommendations")
 
-                for _, row in strategic_brief.head(5).iterrows():
-                    with st.expander(f"Cluster: {row['cluster_name']}"):
-                        st.write(f"**Hub Keyword:** {row['hub_keyword']}")
-                        st.write(f"**Total Keywords:** {row['total_keywords']}")
-                        st.write(f"**Total Volume:** {row['total_volume']:,.0f}")
-                        st.write(f"**Coherence:** {row['coherence']:.2%}")
+                for row in strategic_brief.head(5).itertuples(index=False):
+                    with st.expander(f"Cluster: {row.cluster_name}"):
+                        st.write(f"**Hub Keyword:** {row.hub_keyword}")
+                        st.write(f"**Total Keywords:** {row.total_keywords}")
+                        st.write(f"**Total Volume:** {row.total_volume:,.0f}")
+                        st.write(f"**Coherence:** {row.coherence:.2%}")
 
                         if "DISCOVER" in mode:
-                            st.write(f"**Detected Category:** {row['detected_category']}")
-                            st.write(f"**Confidence:** {row['category_confidence']:.2%}")
+                            st.write(f"**Detected Category:** {row.detected_category}")
+                            st.write(f"**Confidence:** {row.category_confidence:.2%}")
                         else:
-                            matches = row['matches_target']
+                            matches = row.matches_target
                             if matches:
-                                st.success(f"✅ Matches target: {row['confidence_for_target']:.2%}")
+                                st.success(f"✅ Matches target: {row.confidence_for_target:.2%}")
                             else:
-                                st.warning(f"❌ Doesn't match. Detected: {row['detected_category']}")
+                                st.warning(f"❌ Doesn't match. Detected: {row.detected_category}")
 
-                        st.write(f"**Primary Keywords:** {row['primary_keywords']}")
-                        st.write(f"**Top Entities:** {row['top_entities']}")
+                        st.write(f"**Primary Keywords:** {row.primary_keywords}")
+                        st.write(f"**Top Entities:** {row.top_entities}")
 
             except Exception as e:
                 st.error(f"❌ Error: {str(e)}")
@@ -306,13 +457,7 @@ with tab2:
     )
 
     st.write("**Target Category** (searchable dropdown):")
-    target_category_val = st.selectbox(
-        "Select or search for your target category",
-        options=[""] + ALL_CATEGORIES,
-        help="Start typing to search Google's predefined categories",
-        label_visibility="collapsed",
-        key="val_target"
-    )
+    target_category_val = category_picker(key="val_target")
     if not target_category_val:
         st.info("💡 Start typing in the dropdown to search categories (e.g., 'travel', 'family', etc.)")
 
@@ -328,7 +473,7 @@ with tab2:
 
     cluster_id_input = None
     if strategic_brief_file:
-        strategic_brief_df = pd.read_csv(strategic_brief_file)
+        strategic_brief_df = _load_brief(strategic_brief_file.getvalue())
         st.success(f"✅ Loaded strategic brief with {len(strategic_brief_df)} clusters")
 
         # Let user select cluster
@@ -376,10 +521,12 @@ with tab2:
                     del st.session_state['validation_results']
 
                 # Create unique key based on inputs to ensure fresh analysis
-                import hashlib
-                input_hash = hashlib.md5(
-                    f"{draft_text}{target_category_val}{cluster_id_input}{run_drag}".encode()
-                ).hexdigest()
+                # blake2b is faster than md5 here; fed piecewise to skip building one big string
+                hasher = hashlib.blake2b(digest_size=16)
+                for part in (draft_text, target_category_val, cluster_id_input, run_drag):
+                    hasher.update(str(part).encode('utf-8'))
+                    hasher.update(b'\0')
+                input_hash = hasher.hexdigest()
 
                 # Store current inputs to detect changes
                 current_inputs = {
@@ -395,7 +542,7 @@ with tab2:
 
                 st.session_state['last_validation_inputs'] = current_inputs
 
-                validator = DraftValidator()
+                validator = get_validator(google_creds_path)
 
                 results = validator.validate_draft(
                     draft_text=draft_text,
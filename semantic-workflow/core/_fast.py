@@ -0,0 +1,66 @@
+"""
+Optional Numba Kernels
+JIT-compiled versions of hot numeric loops, used when numba is installed.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cluster_stats_kernel(codes, embeddings, n_clusters):
+        n, d = embeddings.shape
+
+        # Per-cluster vector sums (serial: rows of one cluster would race)
+        sums = np.zeros((n_clusters, d), dtype=np.float64)
+        counts = np.zeros(n_clusters, dtype=np.int64)
+        for i in range(n):
+            c = codes[i]
+            counts[c] += 1
+            for k in range(d):
+                sums[c, k] += embeddings[i, k]
+
+        norms = np.empty(n_clusters, dtype=np.float64)
+        coherence = np.empty(n_clusters, dtype=np.float64)
+        for c in prange(n_clusters):
+            sq = 0.0
+            for k in range(d):
+                sq += sums[c, k] * sums[c, k]
+            norms[c] = max(np.sqrt(sq), 1e-12)
+            m = counts[c]
+            coherence[c] = (sq - m) / (m * (m - 1)) if m > 1 else np.nan
+
+        # Dot each row with its cluster sum; no gathered centroid matrix
+        centralities = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            c = codes[i]
+            dot = 0.0
+            for k in range(d):
+                dot += embeddings[i, k] * sums[c, k]
+            centralities[i] = dot / norms[c]
+
+        return centralities, coherence
+
+
+def cluster_stats(codes: np.ndarray, embeddings: np.ndarray):
+    """
+    Numba version of clustering._cluster_stats, fusing the segment sums,
+    centralities and coherences into a single kernel without temporaries.
+
+    Args:
+        codes: Dense cluster code (0..C-1) of each row
+        embeddings: L2-normalized float32 embeddings (same order as codes)
+
+    Returns:
+        Tuple of (per-row centrality, per-cluster coherence; NaN for singletons)
+    """
+    codes = np.ascontiguousarray(codes, dtype=np.int64)
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    n_clusters = int(codes.max()) + 1 if len(codes) else 0
+    return _cluster_stats_kernel(codes, embeddings, n_clusters)
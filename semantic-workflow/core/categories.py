@@ -4,6 +4,11 @@ Common categories for the searchable dropdown.
 Full taxonomy: https://cloud.google.com/natural-language/docs/categories
 """
 
+import functools
+from typing import List, Tuple
+
+import numpy as np
+
 # Most common top-level categories
 TOP_LEVEL_CATEGORIES = [
     "/Arts & Entertainment",
@@ -74,3 +79,26 @@ ALL_CATEGORIES = sorted(list(set(
     TRAVEL_CATEGORIES +
     BUSINESS_CATEGORIES
 )))
+
+# Lowercased index of ALL_CATEGORIES, scanned by search_categories
+_CATEGORIES_LOWER = np.array([c.lower() for c in ALL_CATEGORIES])
+
+
+@functools.lru_cache(maxsize=256)
+def _search_categories(query_lower: str, limit: int) -> Tuple[str, ...]:
+    hits = np.flatnonzero(np.char.find(_CATEGORIES_LOWER, query_lower) >= 0)
+    return tuple(ALL_CATEGORIES[i] for i in hits[:limit])
+
+
+def search_categories(query: str, limit: int = 50) -> List[str]:
+    """
+    Find categories containing a search string (case-insensitive).
+
+    Args:
+        query: Text typed by the user (empty returns the first `limit` categories)
+        limit: Maximum number of results
+
+    Returns:
+        Matching category paths, in taxonomy order
+    """
+    return list(_search_categories((query or "").strip().lower(), limit))
@@ -5,28 +5,148 @@ Handles semantic clustering of keywords using embeddings and hierarchical cluste
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import AgglomerativeClustering
+from sklearn.cluster import AgglomerativeClustering, Birch, HDBSCAN
 import streamlit as st
 
+from core import _fast
+
+try:
+    import simsimd
+    _HAS_SIMSIMD = True
+except ImportError:
+    _HAS_SIMSIMD = False
+
+_SIMSIMD_DTYPES = (np.float16, np.float32, np.float64)
+
+# Above this many keywords, method='auto' switches from average-linkage
+# agglomerative clustering (O(N^2) memory) to Birch (near-linear)
+AGGLOMERATIVE_MAX_KEYWORDS = 10000
+
+CLUSTERING_METHODS = ('auto', 'agglomerative', 'hdbscan', 'birch')
+
+
+def _upcast_half(x: np.ndarray) -> np.ndarray:
+    """
+    Return float16 embeddings as float32 unless SimSIMD can use them directly.
+
+    numpy and sklearn have no half-precision BLAS, so fp16 storage is widened
+    only for the matrix product.
+    """
+    if x.dtype == np.float16 and not _HAS_SIMSIMD:
+        return x.astype(np.float32)
+    return x
+
+
+def _as_embedding_matrix(embeddings) -> np.ndarray:
+    """
+    View embeddings as a single-precision (or half-precision) matrix.
+
+    Arrays already stored as float16/float32 are used as-is (no copy); lists
+    and float64 arrays are converted to float32, halving memory traffic in
+    the similarity products compared with float64.
+    """
+    matrix = np.asarray(embeddings)
+    if matrix.dtype not in (np.float16, np.float32):
+        matrix = matrix.astype(np.float32)
+    return matrix
+
+
+def _cosine_similarity(
+    a: np.ndarray,
+    b: Optional[np.ndarray] = None,
+    normalized: bool = False
+) -> np.ndarray:
+    """
+    Cosine similarity between the rows of `a` and `b` (or `a` with itself).
+
+    Uses SimSIMD's vectorized kernels when installed; otherwise a single
+    matrix product for unit-length rows, or sklearn.
+    """
+    a = _upcast_half(a)
+    b = a if b is None else _upcast_half(b)
+    if _HAS_SIMSIMD and a.dtype == b.dtype and a.dtype in _SIMSIMD_DTYPES:
+        return 1.0 - np.asarray(simsimd.cdist(a, b, metric='cosine'))
+    if normalized:
+        return a @ b.T
+    return cosine_similarity(a, b)
+
+
+def _cluster_stats(
+    codes: np.ndarray,
+    embeddings: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Centrality of every keyword and coherence of every cluster, in bulk.
+
+    For L2-normalized rows the sum of all pairwise similarities within a
+    cluster equals the squared norm of the cluster's vector sum, so
+    coherence is exact without forming any n x n matrix.
+
+    Args:
+        codes: Dense cluster code (0..C-1) of each row
+        embeddings: L2-normalized embeddings (same order as codes)
+
+    Returns:
+        Tuple of (per-row centrality, per-cluster coherence; NaN for singletons)
+    """
+    if _fast.HAS_NUMBA:
+        return _fast.cluster_stats(codes, embeddings)
+
+    embeddings = _upcast_half(embeddings).astype(np.float32, copy=False)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+
+    sums = np.add.reduceat(embeddings[order], starts, axis=0)
+    sq_norms = np.einsum('ij,ij->i', sums, sums)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coherence = np.where(counts > 1, (sq_norms - counts) / (counts * (counts - 1)), np.nan)
+
+    centroids = sums / np.maximum(np.sqrt(sq_norms), 1e-12)[:, None]
+    centralities = np.einsum('ij,ij->i', embeddings, centroids[codes])
+    return centralities, coherence
+
+
+def cluster_row_indices(labels) -> Dict[int, np.ndarray]:
+    """
+    Row positions of every cluster, from a single sort of the labels.
+
+    Args:
+        labels: Cluster label of each row (e.g. df['cluster'])
+
+    Returns:
+        Dict mapping cluster_id to its row positions, in order of first appearance
+    """
+    codes, cluster_ids = pd.factorize(np.asarray(labels))
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(1, len(cluster_ids)))
+    return dict(zip(cluster_ids.tolist(), np.split(order, bounds)))
+
 
 class KeywordClusterer:
     """Clusters keywords based on semantic similarity using embeddings."""
 
-    def __init__(self, distance_threshold: float = 0.5):
+    def __init__(self, distance_threshold: float = 0.5, method: str = 'auto'):
         """
         Initialize clusterer.
 
         Args:
             distance_threshold: Controls cluster tightness (0.3-0.4 = tight, 0.5-0.7 = loose)
+            method: 'agglomerative', 'birch', 'hdbscan', or 'auto' (agglomerative
+                up to AGGLOMERATIVE_MAX_KEYWORDS keywords, Birch beyond)
         """
+        if method not in CLUSTERING_METHODS:
+            raise ValueError(f"Unknown clustering method '{method}'. Use one of: {', '.join(CLUSTERING_METHODS)}")
+
         self.distance_threshold = distance_threshold
+        self.method = method
 
     def cluster_keywords(
         self,
         df: pd.DataFrame,
-        embeddings: List[List[float]],
+        embeddings: np.ndarray,
         show_progress: bool = True
     ) -> pd.DataFrame:
         """
@@ -34,7 +154,7 @@ class KeywordClusterer:
 
         Args:
             df: DataFrame with 'keyword' and 'volume' columns
-            embeddings: List of embeddings (same order as df)
+            embeddings: Embedding matrix, one row per keyword (same order as df)
             show_progress: Whether to show progress in Streamlit
 
         Returns:
@@ -43,18 +163,23 @@ class KeywordClusterer:
         if show_progress:
             st.info("🔄 Clustering keywords by semantic similarity...")
 
-        # Convert embeddings to numpy array
-        embedding_matrix = np.array(embeddings)
+        # Single precision: sklearn runs its cosine distances in float32
+        embedding_matrix = np.asarray(embeddings, dtype=np.float32)
 
-        # Cluster using Agglomerative Clustering
-        clustering = AgglomerativeClustering(
-            n_clusters=None,
-            distance_threshold=self.distance_threshold,
-            metric='cosine',
-            linkage='average'
-        )
+        method = self.method
+        if method == 'auto':
+            method = 'agglomerative' if len(df) <= AGGLOMERATIVE_MAX_KEYWORDS else 'birch'
 
-        df['cluster'] = clustering.fit_predict(embedding_matrix)
+        if method == 'agglomerative':
+            clustering = AgglomerativeClustering(
+                n_clusters=None,
+                distance_threshold=self.distance_threshold,
+                metric='cosine',
+                linkage='average'
+            )
+            df['cluster'] = clustering.fit_predict(embedding_matrix)
+        else:
+            df['cluster'] = self._cluster_large(embedding_matrix, method)
 
         num_clusters = df['cluster'].nunique()
 
@@ -63,10 +188,42 @@ class KeywordClusterer:
 
         return df
 
+    def _cluster_large(self, embedding_matrix: np.ndarray, method: str) -> np.ndarray:
+        """
+        Cluster without a pairwise distance matrix, for large keyword sets.
+
+        On unit vectors Euclidean distance is monotonic in cosine distance
+        (||a - b||^2 = 2 * (1 - cos)), so both methods run on normalized rows.
+
+        Args:
+            embedding_matrix: Embeddings (one row per keyword)
+            method: 'birch' or 'hdbscan'
+
+        Returns:
+            Cluster label for each row
+        """
+        unit = embedding_matrix / np.maximum(
+            np.linalg.norm(embedding_matrix, axis=1, keepdims=True), 1e-12
+        )
+
+        if method == 'birch':
+            # Mean pairwise cosine distance t within a cluster corresponds to
+            # an RMS radius of about sqrt(t) around its centroid
+            clustering = Birch(threshold=float(np.sqrt(self.distance_threshold)), n_clusters=None)
+            return clustering.fit_predict(unit)
+
+        labels = HDBSCAN(min_cluster_size=3, metric='euclidean', copy=False).fit_predict(unit)
+
+        # HDBSCAN marks outliers as -1; give each its own cluster like agglomerative would
+        noise = labels == -1
+        labels[noise] = labels.max() + 1 + np.arange(noise.sum())
+        return labels
+
     def analyze_cluster(
         self,
         cluster_df: pd.DataFrame,
-        cluster_embeddings: np.ndarray
+        cluster_embeddings: np.ndarray,
+        normalized: bool = False
     ) -> Dict:
         """
         Analyze a single cluster to identify hub keyword and assign tiers.
@@ -74,139 +231,238 @@ class KeywordClusterer:
         Args:
             cluster_df: DataFrame of keywords in this cluster
             cluster_embeddings: Embeddings for keywords in this cluster
+            normalized: Whether embeddings are already L2-normalized
 
         Returns:
             Dict with cluster analysis including hub keyword and tier assignments
         """
         if len(cluster_df) == 1:
-            return {
-                'hub_keyword': cluster_df.iloc[0]['keyword'],
-                'primary': [cluster_df.iloc[0]['keyword']],
-                'secondary': [],
-                'tertiary': [],
-                'coherence': 1.0,
-                'total_keywords': 1,
-                'total_volume': cluster_df.iloc[0].get('volume', 0)
-            }
-
-        # Calculate centroid
-        centroid = cluster_embeddings.mean(axis=0).reshape(1, -1)
-
-        # Calculate centrality (distance from centroid)
-        centralities = cosine_similarity(cluster_embeddings, centroid).flatten()
-
-        # Calculate coherence (average pairwise similarity)
-        pairwise_sim = cosine_similarity(cluster_embeddings)
-        coherence = (pairwise_sim.sum() - len(cluster_df)) / (len(cluster_df) * (len(cluster_df) - 1))
+            row = cluster_df.iloc[0]
+            return self._singleton_analysis(row['keyword'], row.get('volume', 0))
+
+        # Normalize once (unless already unit length); centroid, centrality and
+        # coherence then follow from the cluster's vector sum, with no n x n matrix
+        if not normalized:
+            cluster_embeddings = _upcast_half(cluster_embeddings).astype(np.float32)
+            cluster_embeddings /= np.maximum(
+                np.linalg.norm(cluster_embeddings, axis=1, keepdims=True), 1e-12
+            )
+
+        centralities, coherence = _cluster_stats(
+            np.zeros(len(cluster_df), dtype=np.intp),
+            cluster_embeddings
+        )
+        coherence = coherence[0]
 
-        # Add centrality scores
-        cluster_df = cluster_df.copy()
-        cluster_df['centrality'] = centralities
+        volumes = cluster_df['volume'].to_numpy() if 'volume' in cluster_df.columns else np.zeros(len(cluster_df))
+        return self._rank_keywords(cluster_df['keyword'].to_numpy(), volumes, centralities, coherence)
 
-        # Calculate combined score: centrality * log(volume + 1)
-        cluster_df['combined_score'] = cluster_df['centrality'] * np.log(cluster_df.get('volume', 0) + 1)
+    def _singleton_analysis(self, keyword: str, volume) -> Dict:
+        """Analysis of a one-keyword cluster (see analyze_cluster); needs no embeddings."""
+        return {
+            'hub_keyword': keyword,
+            'primary': [keyword],
+            'secondary': [],
+            'tertiary': [],
+            'coherence': 1.0,
+            'total_keywords': 1,
+            'total_volume': volume
+        }
 
-        # Sort by combined score
-        cluster_df = cluster_df.sort_values('combined_score', ascending=False)
+    def _rank_keywords(
+        self,
+        keywords: np.ndarray,
+        volumes: np.ndarray,
+        centralities: np.ndarray,
+        coherence: float
+    ) -> Dict:
+        """
+        Score, sort and tier a multi-keyword cluster (see analyze_cluster).
 
-        # Hub keyword is the one with highest combined score
-        hub_keyword = cluster_df.iloc[0]['keyword']
+        Args:
+            keywords: Keywords in this cluster
+            volumes: Search volume of each keyword
+            centralities: Cosine similarity of each keyword to the cluster centroid
+            coherence: Average pairwise similarity within the cluster
 
-        # Assign tiers
-        n = len(cluster_df)
-        primary_count = min(3, n)
-        secondary_count = min(10, n)
+        Returns:
+            Dict with cluster analysis including hub keyword and tier assignments
+        """
+        # Combined score: centrality * log(volume + 1), ranked highest first
+        combined = centralities * np.log1p(volumes)
+        order = np.argsort(-combined, kind='stable')
+        ranked = keywords[order]
 
-        primary = cluster_df.iloc[0:primary_count]['keyword'].tolist()
-        secondary = cluster_df.iloc[primary_count:secondary_count]['keyword'].tolist()
-        tertiary = cluster_df.iloc[secondary_count:]['keyword'].tolist()
+        # Assign tiers; hub keyword is the one with highest combined score
+        primary = ranked[:3].tolist()
+        secondary = ranked[3:10].tolist()
+        tertiary = ranked[10:].tolist()
 
         return {
-            'hub_keyword': hub_keyword,
+            'hub_keyword': ranked[0],
             'primary': primary,
             'secondary': secondary,
             'tertiary': tertiary,
             'coherence': float(coherence),
-            'total_keywords': len(cluster_df),
-            'total_volume': float(cluster_df.get('volume', 0).sum()),
-            'keywords_detail': cluster_df[['keyword', 'volume', 'centrality', 'combined_score']].to_dict('records')
+            'total_keywords': len(keywords),
+            'total_volume': float(volumes.sum()),
+            'keywords_detail': [
+                {'keyword': k, 'volume': v, 'centrality': c, 'combined_score': sc}
+                for k, v, c, sc in zip(
+                    ranked.tolist(),
+                    volumes[order].tolist(),
+                    centralities[order].tolist(),
+                    combined[order].tolist()
+                )
+            ]
         }
 
     def detect_cannibalization(
         self,
         df: pd.DataFrame,
-        embeddings: List[List[float]],
-        overlap_threshold: float = 0.80
+        embeddings: np.ndarray,
+        overlap_threshold: float = 0.80,
+        normalized: bool = False,
+        centroid_margin: Optional[float] = 0.1,
+        cluster_indices: Optional[Dict[int, np.ndarray]] = None
     ) -> List[Tuple[int, int, float]]:
         """
         Detect clusters that are too similar (potential cannibalization).
 
+        Cluster pairs are first screened by centroid similarity, and only pairs
+        whose centroids are within `centroid_margin` of the threshold get the
+        full keyword-level comparison. The screen is a heuristic; pass
+        centroid_margin=None to compare every pair exactly.
+
         Args:
             df: DataFrame with cluster assignments
-            embeddings: List of embeddings
+            embeddings: Embedding matrix, one row per keyword (same order as df)
             overlap_threshold: Similarity threshold for flagging (0-1)
+            normalized: Whether embeddings are already L2-normalized
+            centroid_margin: How far below the threshold centroid similarity may
+                fall for a pair to still be compared (None disables the screen)
+            cluster_indices: Precomputed cluster_row_indices(df['cluster'])
 
         Returns:
             List of tuples (cluster_id_1, cluster_id_2, similarity_score)
         """
-        embedding_matrix = np.array(embeddings)
-        cluster_ids = df['cluster'].unique()
+        embedding_matrix = _as_embedding_matrix(embeddings)
+        if cluster_indices is None:
+            cluster_indices = cluster_row_indices(df['cluster'])
+        cluster_ids = list(cluster_indices)
         cannibalization_pairs = []
 
-        # Compare each pair of clusters
-        for i, cluster_a in enumerate(cluster_ids):
-            for cluster_b in cluster_ids[i+1:]:
-                # Get embeddings for each cluster
-                emb_a = embedding_matrix[df['cluster'] == cluster_a]
-                emb_b = embedding_matrix[df['cluster'] == cluster_b]
+        # Group rows so each cluster is one contiguous block of rows
+        sizes = np.fromiter((len(rows) for rows in cluster_indices.values()), dtype=np.intp, count=len(cluster_ids))
+        ends = np.cumsum(sizes)
+        starts = ends - sizes
+        order = np.concatenate(list(cluster_indices.values())) if cluster_ids else np.empty(0, dtype=np.intp)
+        sorted_embeddings = _upcast_half(embedding_matrix[order])
+
+        # Centroid similarity of every cluster pair, in one matrix product
+        if centroid_margin is not None:
+            centroids = np.add.reduceat(sorted_embeddings, starts, axis=0, dtype=np.float32)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+            centroid_sim = centroids @ centroids.T
 
-                # Calculate cross-similarity
-                cross_sim = cosine_similarity(emb_a, emb_b)
+        for i in range(len(cluster_ids) - 1):
+            candidates = np.arange(i + 1, len(cluster_ids))
+            if centroid_margin is not None:
+                candidates = candidates[centroid_sim[i, i+1:] >= overlap_threshold - centroid_margin]
+                if not len(candidates):
+                    continue
 
-                # Average of maximum similarities
-                avg_max_sim = cross_sim.max(axis=1).mean()
+            # Candidate clusters' rows as contiguous blocks
+            cols = np.concatenate([np.arange(starts[j], ends[j]) for j in candidates])
+            local_starts = np.r_[0, np.cumsum(sizes[candidates])[:-1]]
 
-                if avg_max_sim >= overlap_threshold:
-                    cannibalization_pairs.append((cluster_a, cluster_b, float(avg_max_sim)))
+            emb_a = sorted_embeddings[starts[i]:ends[i]]
+            cross_sim = _cosine_similarity(emb_a, sorted_embeddings[cols], normalized)
+
+            # Max similarity to each candidate cluster, averaged over cluster_a's keywords
+            avg_max_sim = np.maximum.reduceat(cross_sim, local_starts, axis=1).mean(axis=0)
+
+            for j, sim in zip(candidates, avg_max_sim):
+                if sim >= overlap_threshold:
+                    cannibalization_pairs.append((cluster_ids[i], cluster_ids[j], float(sim)))
 
         return cannibalization_pairs
 
     def analyze_all_clusters(
         self,
         df: pd.DataFrame,
-        embeddings: List[List[float]],
-        show_progress: bool = True
+        embeddings: np.ndarray,
+        show_progress: bool = True,
+        normalized: bool = False,
+        cluster_indices: Optional[Dict[int, np.ndarray]] = None
     ) -> Dict[int, Dict]:
         """
         Analyze all clusters in the dataset.
 
         Args:
             df: DataFrame with cluster assignments
-            embeddings: List of embeddings
+            embeddings: Embedding matrix, one row per keyword (same order as df)
             show_progress: Whether to show progress
+            normalized: Whether embeddings are already L2-normalized
+            cluster_indices: Precomputed cluster_row_indices(df['cluster'])
 
         Returns:
             Dict mapping cluster_id to cluster analysis
         """
-        embedding_matrix = np.array(embeddings)
+        embedding_matrix = _as_embedding_matrix(embeddings)
         cluster_analyses = {}
 
-        cluster_ids = df['cluster'].unique()
+        # Row positions of every cluster from one sort, not one mask per cluster
+        if cluster_indices is None:
+            cluster_indices = cluster_row_indices(df['cluster'])
+        cluster_ids = list(cluster_indices)
+        rows_by_code = list(cluster_indices.values())
+
+        # Reorder once so every cluster is a contiguous block; each cluster's
+        # keywords, volumes and centralities are then slices (views), not gathers
+        sizes = np.fromiter((len(rows) for rows in rows_by_code), dtype=np.intp, count=len(cluster_ids))
+        ends = np.cumsum(sizes)
+        starts = ends - sizes
+        order = np.concatenate(rows_by_code) if cluster_ids else np.empty(0, dtype=np.intp)
+
+        keywords = df['keyword'].to_numpy()[order]
+        if 'volume' in df.columns:
+            volumes = df['volume'].to_numpy()[order]
+        else:
+            volumes = np.zeros(len(order))
+
+        # Normalize once (unless already unit length), then all centralities
+        # and coherences in a few bulk ops over the sorted matrix
+        sorted_embeddings = embedding_matrix[order]
+        if not normalized:
+            sorted_embeddings = _upcast_half(sorted_embeddings).astype(np.float32, copy=False)
+            sorted_embeddings /= np.maximum(
+                np.linalg.norm(sorted_embeddings, axis=1, keepdims=True), 1e-12
+            )
+        centralities, coherence = _cluster_stats(np.repeat(np.arange(len(cluster_ids)), sizes), sorted_embeddings)
 
         if show_progress:
             progress_bar = st.progress(0)
             status_text = st.empty()
 
+        # Each UI update is a frontend round-trip; cap them at ~100
+        tick = max(1, len(cluster_ids) // 100)
+
         for idx, cluster_id in enumerate(cluster_ids):
-            if show_progress:
+            if show_progress and (idx % tick == 0 or idx == len(cluster_ids) - 1):
                 progress = (idx + 1) / len(cluster_ids)
                 progress_bar.progress(progress)
                 status_text.text(f"Analyzing cluster {idx + 1}/{len(cluster_ids)}...")
 
-            cluster_df = df[df['cluster'] == cluster_id].copy()
-            cluster_emb = embedding_matrix[df['cluster'] == cluster_id]
+            start, end = starts[idx], ends[idx]
 
-            analysis = self.analyze_cluster(cluster_df, cluster_emb)
+            if end - start == 1:
+                # Singletons are answered straight from the arrays
+                analysis = self._singleton_analysis(keywords[start], volumes[start])
+            else:
+                analysis = self._rank_keywords(
+                    keywords[start:end], volumes[start:end], centralities[start:end], coherence[idx]
+                )
             cluster_analyses[cluster_id] = analysis
 
         if show_progress:
@@ -3,22 +3,263 @@ OpenAI Embeddings Module
 Handles batch generation of embeddings with rate limiting and error handling.
 """
 
-import time
-from typing import List, Optional
-from openai import OpenAI
+import asyncio
+import functools
+import hashlib
+import os
+import sqlite3
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
 import streamlit as st
 
+try:
+    import tiktoken
+    _HAS_TIKTOKEN = True
+except ImportError:
+    _HAS_TIKTOKEN = False
+
+# Retries (exponential backoff, honoring Retry-After) for rate-limit/5xx/connection errors
+EMBED_MAX_RETRIES = 3
+
+# Default tokens-per-minute budget for concurrent embedding requests
+EMBED_MAX_TOKENS_PER_MINUTE = 1_000_000
+
+# Per-request limits of the embeddings endpoint
+EMBED_MAX_INPUTS_PER_REQUEST = 2048
+EMBED_MAX_TOKENS_PER_REQUEST = 300_000
+
+
+def _clean_text(text: str) -> str:
+    """Normalize text the way it is sent to the embeddings API."""
+    return text.replace("\n", " ").strip()
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count for rate limiting (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+@functools.lru_cache(maxsize=8)
+def _token_counter(model: str) -> Callable[[List[str]], List[int]]:
+    """
+    Token counter for a model: exact with tiktoken, estimated without it.
+
+    Returns:
+        Function mapping a list of texts to their token counts
+    """
+    if _HAS_TIKTOKEN:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda texts: [len(tokens) for tokens in encoding.encode_batch(texts)]
+    return lambda texts: [_estimate_tokens(t) for t in texts]
+
+
+def _pack_batches(
+    token_counts: List[int],
+    max_inputs: int,
+    max_tokens: int
+) -> List[List[int]]:
+    """
+    Greedily pack inputs into request batches by token count.
+
+    Inputs are taken longest first; a batch is closed when adding the next
+    input would exceed either limit.
+
+    Args:
+        token_counts: Token count of each input
+        max_inputs: Maximum inputs per batch
+        max_tokens: Maximum total tokens per batch
+
+    Returns:
+        Batches of input positions
+    """
+    order = sorted(range(len(token_counts)), key=lambda i: token_counts[i], reverse=True)
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    batch_tokens = 0
+
+    for i in order:
+        if batch and (len(batch) >= max_inputs or batch_tokens + token_counts[i] > max_tokens):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += token_counts[i]
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class _TokenBucket:
+    """
+    Async token bucket for the embeddings tokens-per-minute limit.
+
+    Starts full and refills continuously, so callers only wait when they are
+    genuinely about to exceed the budget. The level can be lowered to match
+    the server's own count from rate-limit response headers.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.level = self.capacity
+        self._lock = asyncio.Lock()
+        self._loop = asyncio.get_running_loop()
+        self._updated = self._loop.time()
+
+    def _refill(self):
+        now = self._loop.time()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def take(self, tokens: int):
+        """Wait until `tokens` are available (capped at capacity), then spend them."""
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            if self.level < tokens:
+                await asyncio.sleep((tokens - self.level) / self.rate)
+                self._refill()
+            self.level -= tokens
+
+    def sync(self, remaining_tokens: Optional[str]):
+        """Lower the level to the server-reported remaining tokens, if given."""
+        try:
+            remaining = float(remaining_tokens)
+        except (TypeError, ValueError):
+            return
+        self._refill()
+        self.level = min(self.level, remaining)
+
+
+class EmbeddingCache:
+    """Disk-backed SQLite cache of embeddings keyed by model and text."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize cache.
+
+        Args:
+            path: SQLite file location (defaults to EMBEDDING_CACHE_PATH or
+                ~/.cache/semantic-workflow/embeddings.sqlite3)
+        """
+        self.path = os.path.expanduser(path or os.getenv(
+            "EMBEDDING_CACHE_PATH",
+            os.path.join("~", ".cache", "semantic-workflow", "embeddings.sqlite3")
+        ))
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "hash TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL)"
+                )
+        except (OSError, sqlite3.Error):
+            # Unwritable location - run without a cache
+            self.path = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        """
+        Cache key for a text embedded with a given model.
+
+        Texts that clean to the same API input share a key, so whitespace
+        variants of a keyword hit the same cached vector.
+        """
+        return hashlib.sha256(f"{model}|{_clean_text(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            Dict mapping each cached text to its float32 vector
+        """
+        if not self.path or not texts:
+            return {}
+
+        texts_by_hash: Dict[str, List[str]] = {}
+        for t in texts:
+            texts_by_hash.setdefault(self.key(model, t), []).append(t)
+        hashes = list(texts_by_hash)
+        found = {}
+
+        try:
+            with self._connect() as conn:
+                # Stay under SQLite's bound-parameter limit
+                for i in range(0, len(hashes), 500):
+                    chunk = hashes[i:i+500]
+                    rows = conn.execute(
+                        f"SELECT hash, vec FROM embeddings WHERE model = ? AND dim > 0 "
+                        f"AND hash IN ({','.join('?' * len(chunk))})",
+                        [model, *chunk]
+                    )
+                    for h, vec in rows:
+                        vector = np.frombuffer(vec, dtype=np.float32)
+                        for t in texts_by_hash[h]:
+                            found[t] = vector
+        except sqlite3.Error:
+            return {}
+
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, np.ndarray]):
+        """
+        Store embeddings.
+
+        Args:
+            model: Embedding model name
+            vectors: Dict mapping text to its embedding
+        """
+        if not self.path or not vectors:
+            return
+
+        # Never store empty vectors; they would shadow real ones on every later run
+        rows = [
+            (self.key(model, text), model, len(vec), np.asarray(vec, dtype=np.float32).tobytes())
+            for text, vec in vectors.items()
+            if len(vec)
+        ]
+        if not rows:
+            return
+
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (hash, model, dim, vec) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+        except sqlite3.Error:
+            pass
+
 
 class EmbeddingGenerator:
     """Generates embeddings using OpenAI's API with batching and rate limiting."""
 
-    def __init__(self, api_key: str, model: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "text-embedding-3-small",
+        cache: Optional[EmbeddingCache] = None
+    ):
+        self.api_key = api_key
         self.client = OpenAI(api_key=api_key)
         self.model = model
+        self.cache = cache or EmbeddingCache()
 
     def get_embedding(self, text: str) -> List[float]:
         """Get embedding for a single text string."""
-        text = text.replace("\n", " ").strip()
+        text = _clean_text(text)
         if not text:
             raise ValueError("Cannot generate embedding for empty text")
 
@@ -31,56 +272,146 @@ class EmbeddingGenerator:
     def get_embeddings_batch(
         self,
         texts: List[str],
-        batch_size: int = 100,
+        batch_size: int = EMBED_MAX_INPUTS_PER_REQUEST,
         show_progress: bool = True
-    ) -> List[List[float]]:
+    ) -> np.ndarray:
         """
-        Get embeddings for multiple texts in batches.
+        Get embeddings for multiple texts, reusing cached vectors where possible.
+
+        Only texts missing from the cache are sent to the API (concurrently);
+        their vectors are stored for later runs.
 
         Args:
             texts: List of text strings to embed
-            batch_size: Number of texts to process per API call
+            batch_size: Maximum number of texts per API call
             show_progress: Whether to show progress in Streamlit
 
         Returns:
-            List of embeddings (same order as input texts)
+            float32 matrix with one row per text (same order as input texts);
+            rows whose embedding failed are NaN
         """
-        embeddings = []
-        total_batches = (len(texts) - 1) // batch_size + 1
+        cached = self.cache.get_many(self.model, texts)
+        missing = list(dict.fromkeys(t for t in texts if t not in cached))
+
+        if show_progress and cached:
+            st.info(f"♻️ Reusing {len(texts) - len(missing)} cached embeddings")
+
+        if missing:
+            fresh = asyncio.run(self.embed_keywords_concurrent(
+                missing,
+                batch_size=batch_size,
+                show_progress=show_progress
+            ))
+            new_vectors = {
+                text: vec
+                for text, vec in zip(missing, fresh)
+                if vec.size and not np.isnan(vec).any()
+            }
+            self.cache.put_many(self.model, new_vectors)
+            cached.update(new_vectors)
+
+        dim = len(next(iter(cached.values()))) if cached else 0
+        embeddings = np.full((len(texts), dim), np.nan, dtype=np.float32)
+        for row, text in enumerate(texts):
+            vec = cached.get(text)
+            if vec is not None:
+                embeddings[row] = vec
+
+        return embeddings
+
+    async def embed_keywords_concurrent(
+        self,
+        keywords: List[str],
+        max_concurrency: int = 8,
+        batch_size: int = EMBED_MAX_INPUTS_PER_REQUEST,
+        max_tokens_per_minute: int = EMBED_MAX_TOKENS_PER_MINUTE,
+        show_progress: bool = True
+    ) -> np.ndarray:
+        """
+        Get embeddings for many keywords with concurrent batch requests.
+
+        Keywords are packed longest-first into batches bounded by both input
+        count and total tokens (counted with tiktoken when installed), so
+        short keywords share few large requests; up to `max_concurrency`
+        batches are in flight at once. Batches
+        draw their estimated tokens from a token bucket that is kept in step
+        with the API's x-ratelimit-remaining-tokens header, so requests only
+        wait when close to the limit. Transient API errors are retried by the
+        client with backoff.
+
+        Args:
+            keywords: List of keyword strings to embed
+            max_concurrency: Maximum number of API calls in flight
+            batch_size: Maximum number of keywords per API call
+            max_tokens_per_minute: Token budget per minute
+            show_progress: Whether to show progress in Streamlit
+
+        Returns:
+            float32 matrix with one row per keyword (same order as input
+            keywords); rows of failed batches are NaN
+        """
+        # Allocated once the first response reveals the embedding width
+        embeddings = np.full((len(keywords), 0), np.nan, dtype=np.float32)
+        if not keywords:
+            return embeddings
+
+        # Count tokens once; used for packing and for the rate limiter
+        clean_keywords = [_clean_text(k) for k in keywords]
+        token_counts = _token_counter(self.model)(clean_keywords)
+
+        # Pack by token count, remembering original positions
+        batches = _pack_batches(
+            token_counts,
+            max_inputs=min(batch_size, EMBED_MAX_INPUTS_PER_REQUEST),
+            max_tokens=EMBED_MAX_TOKENS_PER_REQUEST
+        )
+        total_batches = len(batches)
 
         if show_progress:
             progress_bar = st.progress(0)
             status_text = st.empty()
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
-            batch_num = i // batch_size + 1
+        client = AsyncOpenAI(api_key=self.api_key, max_retries=EMBED_MAX_RETRIES)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        completed = 0
 
-            if show_progress:
-                progress = batch_num / total_batches
-                progress_bar.progress(progress)
-                status_text.text(f"Generating embeddings: batch {batch_num}/{total_batches}")
-
-            # Clean batch texts
-            clean_batch = [t.replace("\n", " ").strip() for t in batch if t.strip()]
-
-            # Get embeddings for this batch
-            try:
-                response = self.client.embeddings.create(
-                    input=clean_batch,
-                    model=self.model
-                )
-                batch_embeddings = [item.embedding for item in response.data]
-                embeddings.extend(batch_embeddings)
+        bucket = _TokenBucket(max_tokens_per_minute)
+
+        async def embed_batch(batch_num: int, indices: List[int]):
+            nonlocal completed, embeddings
+            clean_batch = [clean_keywords[i] for i in indices]
 
-            except Exception as e:
-                st.error(f"Error processing batch {batch_num}: {e}")
-                # Return None for failed embeddings
-                embeddings.extend([None] * len(clean_batch))
+            async with semaphore:
+                await bucket.take(sum(token_counts[i] for i in indices))
+                try:
+                    raw = await client.embeddings.with_raw_response.create(
+                        input=clean_batch,
+                        model=self.model
+                    )
+                    bucket.sync(raw.headers.get('x-ratelimit-remaining-tokens'))
+                    response = raw.parse()
+                    if not embeddings.shape[1] and response.data:
+                        embeddings = np.full(
+                            (len(keywords), len(response.data[0].embedding)), np.nan, dtype=np.float32
+                        )
+                    # item.index is the position within this request's input
+                    for item in response.data:
+                        embeddings[indices[item.index]] = item.embedding
+                except Exception as e:
+                    st.error(f"Error processing batch {batch_num}: {e}")
+
+            completed += 1
+            if show_progress:
+                progress_bar.progress(completed / total_batches)
+                status_text.text(f"Generating embeddings: batch {completed}/{total_batches}")
 
-            # Rate limiting: small delay between batches
-            if i + batch_size < len(texts):
-                time.sleep(0.1)
+        try:
+            await asyncio.gather(*(
+                embed_batch(batch_num, indices)
+                for batch_num, indices in enumerate(batches, start=1)
+            ))
+        finally:
+            await client.close()
 
         if show_progress:
             progress_bar.progress(1.0)
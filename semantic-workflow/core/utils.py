@@ -2,8 +2,49 @@
 Utility functions for data processing and validation.
 """
 
+import csv
+import functools
+import itertools
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import AbstractSet, Iterable, List, Dict, Optional, Set, Tuple, Union
+
+try:
+    import ahocorasick
+    _HAS_AHOCORASICK = True
+except ImportError:
+    _HAS_AHOCORASICK = False
+
+# Max number of keyword coverage results memoized by calculate_keyword_coverage
+COVERAGE_CACHE_SIZE = 64
+
+_coverage_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_coverage_cache_lock = threading.Lock()
+
+# Common variations for keyword column
+KEYWORD_PATTERNS = [
+    'keyword', 'keywords', 'query', 'queries', 'search query',
+    'search queries', 'search term', 'search terms', 'term',
+    'terms', 'kw', 'search', 'phrase', 'phrases'
+]
+
+# Common variations for volume column
+VOLUME_PATTERNS = [
+    'volume', 'search volume', 'monthly search volume', 'msv',
+    'sv', 'searches', 'monthly searches', 'avg monthly searches',
+    'search vol', 'monthly volume', 'avg searches', 'search count',
+    'monthly search', 'monthly search count'
+]
+
+_KEYWORD_COLUMNS = frozenset(KEYWORD_PATTERNS)
+_VOLUME_COLUMNS = frozenset(VOLUME_PATTERNS)
+
+# Partial-match fallbacks when no column name matches a pattern exactly
+_KEYWORD_PARTIAL_RE = re.compile(r'keyword|query|term|phrase')
+_VOLUME_PARTIAL_RE = re.compile(r'volume|search|msv|sv')
 
 
 def validate_keywords_csv(df: pd.DataFrame) -> pd.DataFrame:
@@ -23,40 +64,19 @@ def validate_keywords_csv(df: pd.DataFrame) -> pd.DataFrame:
     Raises:
         ValueError: If required columns are missing
     """
-    # Common variations for keyword column
-    KEYWORD_PATTERNS = [
-        'keyword', 'keywords', 'query', 'queries', 'search query',
-        'search queries', 'search term', 'search terms', 'term',
-        'terms', 'kw', 'search', 'phrase', 'phrases'
-    ]
-
-    # Common variations for volume column
-    VOLUME_PATTERNS = [
-        'volume', 'search volume', 'monthly search volume', 'msv',
-        'sv', 'searches', 'monthly searches', 'avg monthly searches',
-        'search vol', 'monthly volume', 'avg searches', 'search count',
-        'monthly search', 'monthly search count'
-    ]
-
     # Standardize column names (lowercase, strip whitespace)
     df.columns = df.columns.str.lower().str.strip()
 
-    # Find keyword column
-    keyword_col = None
-    for col in df.columns:
-        # Remove common extra characters
-        clean_col = col.replace('_', ' ').replace('-', ' ').strip()
-        if clean_col in KEYWORD_PATTERNS:
-            keyword_col = col
-            break
+    # Remove common extra characters, once per column
+    clean_cols = {col: col.replace('_', ' ').replace('-', ' ').strip() for col in df.columns}
 
+    # Find keyword column: exact match first, then partial matching as fallback
+    keyword_col = next((col for col, clean in clean_cols.items() if clean in _KEYWORD_COLUMNS), None)
     if not keyword_col:
-        # Try partial matching as fallback
-        for col in df.columns:
-            clean_col = col.replace('_', ' ').replace('-', ' ').strip()
-            if any(pattern in clean_col for pattern in ['keyword', 'query', 'term', 'phrase']):
-                keyword_col = col
-                break
+        keyword_col = next((
+            col for col, clean in clean_cols.items()
+            if _KEYWORD_PARTIAL_RE.search(clean)
+        ), None)
 
     if not keyword_col:
         available_cols = ', '.join(df.columns.tolist())
@@ -65,23 +85,13 @@ def validate_keywords_csv(df: pd.DataFrame) -> pd.DataFrame:
             f"Expected one of: {', '.join(KEYWORD_PATTERNS[:5])}, etc."
         )
 
-    # Find volume column
-    volume_col = None
-    for col in df.columns:
-        clean_col = col.replace('_', ' ').replace('-', ' ').strip()
-        if clean_col in VOLUME_PATTERNS:
-            volume_col = col
-            break
-
+    # Find volume column, never reusing the keyword column for a partial match
+    volume_col = next((col for col, clean in clean_cols.items() if clean in _VOLUME_COLUMNS), None)
     if not volume_col:
-        # Try partial matching as fallback
-        for col in df.columns:
-            clean_col = col.replace('_', ' ').replace('-', ' ').strip()
-            if any(pattern in clean_col for pattern in ['volume', 'search', 'msv', 'sv']):
-                # Make sure it's not the keyword column we already found
-                if col != keyword_col:
-                    volume_col = col
-                    break
+        volume_col = next((
+            col for col, clean in clean_cols.items()
+            if col != keyword_col and _VOLUME_PARTIAL_RE.search(clean)
+        ), None)
 
     # Rename columns to standard names
     rename_map = {keyword_col: 'keyword'}
@@ -94,56 +104,189 @@ def validate_keywords_csv(df: pd.DataFrame) -> pd.DataFrame:
     if 'volume' not in df.columns:
         df['volume'] = 0
 
-    # Keep only the columns we need (plus any extra for reference)
+    # Keep only the columns we need (drop the extra stuff from columns H, I, etc.)
     # This prevents issues with many-column spreadsheets
-    essential_cols = ['keyword', 'volume']
-    extra_cols = [col for col in df.columns if col not in essential_cols]
+    df = df.loc[df['keyword'].notna(), ['keyword', 'volume']]
+
+    # Clean data: normalize keywords, then drop empty and duplicate ones in one filter
+    keywords = df['keyword'].astype(str).str.strip().str.lower()
+    keep = (keywords != '') & ~keywords.duplicated()
 
-    # Clean data
-    df = df.dropna(subset=['keyword'])
-    df['keyword'] = df['keyword'].astype(str).str.strip().str.lower()
-    df = df.drop_duplicates(subset=['keyword'])
-    df['volume'] = pd.to_numeric(df['volume'], errors='coerce').fillna(0)
+    # Unparseable or non-finite volumes count as 0; stored as integers like the source data.
+    # Columns the CSV reader already typed as integers need no coercion
+    volume = df['volume'][keep]
+    if pd.api.types.is_integer_dtype(volume) and not volume.hasnans:
+        volume = volume.to_numpy(dtype=np.int64)
+    else:
+        volume = pd.to_numeric(volume, errors='coerce').to_numpy(dtype=np.float64, na_value=0.0)
+        volume = np.where(np.isfinite(volume), volume, 0.0).astype(np.int64)
 
-    # Remove empty keywords
-    df = df[df['keyword'] != '']
+    return pd.DataFrame({
+        'keyword': keywords[keep],
+        'volume': volume
+    })
 
-    # Keep only essential columns (drop the extra stuff from columns H, I, etc.)
-    df = df[essential_cols]
 
-    return df
+def load_keywords_csv(path_or_buf) -> pd.DataFrame:
+    """
+    Read a keywords CSV and validate it (see validate_keywords_csv).
+
+    Parses with pyarrow's multithreaded reader, which also types numeric
+    volume columns up front, falling back to pandas' C engine when pyarrow
+    is not installed or can't parse the file.
+
+    Args:
+        path_or_buf: File path or file-like object
+
+    Returns:
+        Cleaned DataFrame with standardized columns
+    """
+    try:
+        df = pd.read_csv(path_or_buf, engine='pyarrow')
+    except (ImportError, ValueError):
+        if hasattr(path_or_buf, 'seek'):
+            path_or_buf.seek(0)
+        df = pd.read_csv(path_or_buf, engine='c', low_memory=False)
+    return validate_keywords_csv(df)
+
+
+@functools.lru_cache(maxsize=256)
+def _normalize_keywords(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Lowercase a keyword list (memoized; briefs are re-checked against many drafts)."""
+    return tuple(kw.lower() for kw in keywords)
+
+
+@functools.lru_cache(maxsize=64)
+def _keyword_automaton(keywords_lower: Tuple[str, ...]) -> "ahocorasick.Automaton":
+    """Build (and memoize) an Aho-Corasick automaton over a keyword set."""
+    automaton = ahocorasick.Automaton()
+    for kw in keywords_lower:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+def find_keywords(
+    text_lower: str,
+    keywords_lower: Iterable[str],
+    text_tokens: Optional[AbstractSet[str]] = None
+) -> Set[str]:
+    """
+    Find which lowercased keywords occur as substrings of a lowercased text.
+
+    Uses a single Aho-Corasick pass over the text when pyahocorasick is
+    installed, instead of one substring scan per keyword. Automata are
+    memoized per keyword set, so re-validating against the same brief
+    skips construction.
+
+    When ``text_tokens`` is given, keywords that are whole tokens of the
+    text are resolved by set lookup first; the scan is skipped when that
+    finds them all. Token hits are always substring hits too, so results
+    are the same either way.
+
+    Args:
+        text_lower: Lowercased text to search
+        keywords_lower: Lowercased keywords to look for
+        text_tokens: Optional set of word tokens from text_lower
+
+    Returns:
+        Set of keywords found in the text
+    """
+    keywords_lower = set(keywords_lower)
+    if not keywords_lower:
+        return set()
+
+    found = set()
+    if text_tokens is not None:
+        found = {kw for kw in keywords_lower if kw in text_tokens}
+        if len(found) == len(keywords_lower):
+            return found
+
+    if _HAS_AHOCORASICK:
+        # Built from the full keyword set so the memoized automaton doesn't
+        # depend on which keywords this particular draft happens to contain
+        automaton = _keyword_automaton(tuple(sorted(keywords_lower)))
+        return found | {kw for _, kw in automaton.iter(text_lower)}
+
+    return found | {kw for kw in keywords_lower - found if kw in text_lower}
 
 
 def calculate_keyword_coverage(
     draft_text: str,
     primary_keywords: List[str],
     secondary_keywords: List[str],
-    tertiary_keywords: List[str]
+    tertiary_keywords: List[str],
+    draft_lower: Optional[str] = None,
+    draft_tokens: Optional[AbstractSet[str]] = None
 ) -> Dict:
     """
     Calculate how well a draft covers target keywords.
 
+    Results for the last COVERAGE_CACHE_SIZE (draft, keywords) combinations
+    are memoized, so Streamlit reruns on an unchanged draft skip the scan.
+
     Args:
         draft_text: The draft content
         primary_keywords: List of primary keywords
         secondary_keywords: List of secondary keywords
         tertiary_keywords: List of tertiary keywords
+        draft_lower: Pre-lowercased draft_text, if the caller already has it
+        draft_tokens: Word tokens of draft_lower, if the caller already has them
 
     Returns:
         Dict with coverage percentages and missing keywords
     """
-    draft_lower = draft_text.lower()
+    cache_key = (draft_text, tuple(primary_keywords), tuple(secondary_keywords), tuple(tertiary_keywords))
+
+    with _coverage_cache_lock:
+        result = _coverage_cache.get(cache_key)
+        if result is not None:
+            _coverage_cache.move_to_end(cache_key)
+
+    if result is None:
+        result = _keyword_coverage(*cache_key, draft_lower=draft_lower, draft_tokens=draft_tokens)
+        with _coverage_cache_lock:
+            _coverage_cache[cache_key] = result
+            if len(_coverage_cache) > COVERAGE_CACHE_SIZE:
+                _coverage_cache.popitem(last=False)
+
+    # Callers get their own copy; the cached lists must not be mutated
+    return {tier: {**stats, 'missing': list(stats['missing'])} for tier, stats in result.items()}
 
-    def check_coverage(keywords: List[str]) -> tuple:
+
+def _keyword_coverage(
+    draft_text: str,
+    primary_keywords: Tuple[str, ...],
+    secondary_keywords: Tuple[str, ...],
+    tertiary_keywords: Tuple[str, ...],
+    draft_lower: Optional[str] = None,
+    draft_tokens: Optional[AbstractSet[str]] = None
+) -> Dict:
+    """Uncached calculate_keyword_coverage."""
+    if draft_lower is None:
+        draft_lower = draft_text.lower()
+
+    # Lowercase each keyword once; reused for the scan and the found/missing split
+    primary_lower = _normalize_keywords(primary_keywords)
+    secondary_lower = _normalize_keywords(secondary_keywords)
+    tertiary_lower = _normalize_keywords(tertiary_keywords)
+
+    # One scan of the draft for every keyword in every tier
+    found_lower = find_keywords(
+        draft_lower,
+        itertools.chain(primary_lower, secondary_lower, tertiary_lower),
+        text_tokens=draft_tokens
+    )
+
+    def check_coverage(keywords: Tuple[str, ...], keywords_lower: Tuple[str, ...]) -> tuple:
         if not keywords:
             return 0, 0, []
-        found = [kw for kw in keywords if kw.lower() in draft_lower]
-        missing = [kw for kw in keywords if kw.lower() not in draft_lower]
-        return len(found), len(keywords), missing
+        missing = [kw for kw, kw_lower in zip(keywords, keywords_lower) if kw_lower not in found_lower]
+        return len(keywords) - len(missing), len(keywords), missing
 
-    primary_found, primary_total, primary_missing = check_coverage(primary_keywords)
-    secondary_found, secondary_total, secondary_missing = check_coverage(secondary_keywords)
-    tertiary_found, tertiary_total, tertiary_missing = check_coverage(tertiary_keywords)
+    primary_found, primary_total, primary_missing = check_coverage(primary_keywords, primary_lower)
+    secondary_found, secondary_total, secondary_missing = check_coverage(secondary_keywords, secondary_lower)
+    tertiary_found, tertiary_total, tertiary_missing = check_coverage(tertiary_keywords, tertiary_lower)
 
     return {
         'primary': {
@@ -180,23 +323,41 @@ def format_category_hierarchy(category: str) -> str:
     if not category:
         return ""
 
-    parts = category.strip('/').split('/')
-    depth = len(parts) - 1
-    indent = "  " * depth
-    return f"{indent}• {parts[-1]}"
+    path = category.strip('/')
+    indent = "  " * path.count('/')
+    return f"{indent}• {path.rsplit('/', 1)[-1]}"
 
 
-def export_to_csv(data: List[Dict], filename: str) -> str:
+def export_to_csv(data: Union[List[Dict], pd.DataFrame], filename: str) -> str:
     """
     Export data to CSV.
 
+    Rows are streamed with csv.DictWriter rather than first building a
+    DataFrame. Columns are the union of all row keys, in first-seen order;
+    missing values are left blank.
+
     Args:
-        data: List of dictionaries
+        data: List of dictionaries (or a DataFrame, written as-is)
         filename: Output filename
 
     Returns:
         Path to saved file
     """
-    df = pd.DataFrame(data)
-    df.to_csv(filename, index=False)
+    if isinstance(data, pd.DataFrame):
+        data.to_csv(filename, index=False)
+        return filename
+
+    fieldnames = list(dict.fromkeys(key for row in data for key in row))
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        if fieldnames:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            # Blank cells for NaN/None, as DataFrame.to_csv writes them
+            writer.writerows(
+                {key: '' if value is None or (isinstance(value, float) and np.isnan(value)) else value
+                 for key, value in row.items()}
+                for row in data
+            )
+        else:
+            f.write('\n')
     return filename